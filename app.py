@@ -2,7 +2,7 @@
 
 import logging
 import argparse
-from dockerbk.container import Container
+from dockerbk.container import Container, ARCHIVE_EXTENSIONS
 from utils.logger import Logger
 from dockerbk.databasebackup import DatabaseBackup
 
@@ -11,6 +11,15 @@ __version__ = "0.0.1"
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 
 
+def positive_int(value):
+    """
+    argparse type accepting only integers greater than zero.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
 
 if __name__ == "__main__":
 
@@ -30,6 +39,30 @@ if __name__ == "__main__":
         default=".",
         help="Path to backup files (default: .)",
     )
+    parser.add_argument(
+        "--mode",
+        choices=["list", "backup", "full"],
+        default="full",
+        help="list: only show detected containers; backup: dump databases only; "
+             "full: dump databases and archive Docker volumes (default: full)",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=list(ARCHIVE_EXTENSIONS),
+        default="gz",
+        help="Compression of the Docker volumes archive (default: gz)",
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=positive_int,
+        default=4,
+        help="Number of database backups to run concurrently (default: 4)",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="Write a SHA-256 checksum file next to each database dump.",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -47,25 +80,41 @@ if __name__ == "__main__":
     log = logger or logging.getLogger(__name__)
     containers = Container(logger=log)
     dbbackup = DatabaseBackup(logger=log)
-    containers_list = containers.get_running_containers()
-    if not containers_list:
+    if not containers.running_containers:
         print("No running containers found.")
 
-    containers.stop_containers(db=False)
-    for name in containers_list:
-        is_db, db_type = containers.verify_database_type_from_image(name)
-        if is_db:
-            log.info(f"Container: {name}, DB Type: {db_type}")
-            try:
-                dbbackup.manage_backup(name, db_type, args.backup_path)
-            except Exception as e:
-                logger.error(f"Backup failed: {e}")
-        else:
-            log.debug(f"Container: {name} is not a supported database.")
+    # --------------------------------------------------------------------------
+    # 3) Run the requested mode on the single classification done above
+    # --------------------------------------------------------------------------
+    if args.mode == "list":
+        print("\nDatabase Containers:")
+        for db in containers.db_containers:
+            print(f"- {db['name']} ({db['db_type']})")
+        print("\nApplication Containers:")
+        for app in containers.app_containers:
+            print(f"- {app}")
+    else:
+        containers.stop_containers(db=False)
+        # Containers stopped here are restarted even if a backup step fails
+        try:
+            for name in containers.app_containers:
+                log.debug(f"Container: {name} is not a supported database.")
+            for db in containers.db_containers:
+                log.info(f"Container: {db['name']}, DB Type: {db['db_type']}")
+            dbbackup.manage_backups(
+                [(db["name"], db["db_type"]) for db in containers.db_containers],
+                args.backup_path,
+                max_workers=args.jobs,
+                checksum=args.checksum,
+            )
 
-    containers.stop_containers(db=True)
-    log.info("Creating Docker volumes backup tar.gz...")
-    containers.create_tar_gz(args.backup_path)
-    containers.start_containers(db=True)
-    containers.start_containers(db=False)
+            if args.mode == "full":
+                containers.stop_containers(db=True)
+                try:
+                    log.info("Creating Docker volumes backup archive...")
+                    containers.create_tar_gz(args.backup_path, compression=args.compression)
+                finally:
+                    containers.start_containers(db=True)
+        finally:
+            containers.start_containers(db=False)
 
@@ -1,15 +1,51 @@
 import subprocess
-import json
 import logging
+import re
 import tarfile
 import os
+import shutil
 from datetime import datetime
+from types import MappingProxyType
 
 __version__ = "0.0.1"
 
-LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
-logging.basicConfig(format=LOG_FORMAT)
-logger = logging.getLogger(__name__)
+# Logging is configured by the entry point; modules only get their logger
+_LOG = logging.getLogger(__name__)
+
+# Absolute paths of the docker and tar CLIs, resolved once at import so subprocess can use posix_spawn
+_DOCKER = shutil.which("docker") or "docker"
+_TAR = shutil.which("tar") or "tar"
+
+
+# Image name fragments identifying database containers.
+# The first fragment found in the image name decides the type, independently of dict order.
+_DB_MAPPING = MappingProxyType({
+    "mariadb": "MariaDB",
+    "mysql": "MySQL",
+    "postgres": "PostgreSQL",
+    "mongo": "MongoDB",
+    "redis": "Redis",
+    "oracle": "Oracle",
+    "mssql": "SQL Server"
+})
+_DB_RE = re.compile(f"({'|'.join(_DB_MAPPING)})")
+# Image IDs reported by docker ps in place of the image name
+_IMAGE_ID_RE = re.compile(r"^(sha256:)?[0-9a-f]{12,64}$")
+
+# Volume archive file extension for each supported compression
+ARCHIVE_EXTENSIONS = MappingProxyType({
+    "gz": ".tar.gz",
+    "zst": ".tar.zst",
+    "none": ".tar"
+})
+
+
+def _skip_special_files(tarinfo):
+    """
+    tarfile filter dropping FIFOs and device nodes, which carry no volume data.
+    Sockets are already skipped by tarfile itself.
+    """
+    return None if tarinfo.isdev() else tarinfo
 
 
 class Container:
@@ -22,66 +58,73 @@ class Container:
         self.get_typed_containers(self.logger)
 
     @staticmethod
-    def verify_database_type_from_image(container_name, logger=None):
+    def verify_database_type_from_image(image):
         """
-        Verifies the database type via the container's image.
+        Verifies the database type from the container's image name.
         Returns a tuple (is_db: bool, db_type: str).
         """
-        db_mapping = {
-            "mysql": "MySQL",
-            "postgres": "PostgreSQL",
-            "mongo": "MongoDB",
-            "redis": "Redis",
-            "mariadb": "MariaDB",
-            "oracle": "Oracle",
-            "mssql": "SQL Server"
-        }
-        log = logger or logging.getLogger(__name__)
+        m = _DB_RE.search(image.lower())
+        return (True, _DB_MAPPING[m.group(1)]) if m else (False, None)
+
+    @staticmethod
+    def get_running_containers(logger=None):
+        """
+        Returns the list of (name, image) tuples of running containers via Docker.
+        """
+        log = logger or _LOG
         try:
             result = subprocess.run(
-                ["docker", "inspect", container_name],
+                [_DOCKER, "ps", "--no-trunc", "--format", "{{.Names}}\t{{.Image}}"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
+                close_fds=False,
                 check=True
             )
-            info = json.loads(result.stdout)
-            image = info[0]["Config"]["Image"].lower()
-            for key in db_mapping:
-                if key in image:
-                    return True, db_mapping[key]
-            return False, None
+            containers = []
+            for line in result.stdout.splitlines():
+                if line:
+                    name, _, image = line.decode().partition('\t')
+                    containers.append((name, image))
         except Exception as e:
-            log.error(f"Error inspecting container '{container_name}': {e}")
-            return False, None
+            log.error(f"Error retrieving containers: {e}")
+            return []
+        return Container.resolve_image_ids(containers, log)
 
     @staticmethod
-    def get_running_containers(logger=None):
+    def resolve_image_ids(containers, logger=None):
         """
-        Returns the list of names of running containers via Docker.
+        Replaces image IDs in (name, image) tuples with the image name the container was created from.
+        docker ps shows the ID when the container's tag has since moved to a newer image;
+        all such containers are resolved with a single batched docker inspect.
         """
-        log = logger or logging.getLogger(__name__)
+        log = logger or _LOG
+        unresolved = [name for name, image in containers if _IMAGE_ID_RE.match(image)]
+        if not unresolved:
+            return containers
         try:
             result = subprocess.run(
-                ["docker", "ps", "--format", "{{.Names}}"],
+                [_DOCKER, "inspect", "--format", "{{.Name}}\t{{.Config.Image}}", *unresolved],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
+                close_fds=False,
                 check=True
             )
-            containers = result.stdout.strip().split('\n')
-            return [c for c in containers if c]
         except Exception as e:
-            log.error(f"Error retrieving containers: {e}")
-            return []
+            log.error(f"Error resolving container images: {e}")
+            return containers
+        images = {}
+        for line in result.stdout.splitlines():
+            name, _, image = line.decode().partition('\t')
+            images[name.lstrip('/')] = image
+        return [(name, images.get(name, image)) for name, image in containers]
 
     def get_typed_containers(self, logger=None):
         """
         Populates db_containers and app_containers lists.
         """
         log = logger or self.logger
-        for name in self.running_containers:
-            is_db, db_type = Container.verify_database_type_from_image(name, log)
+        for name, image in self.running_containers:
+            is_db, db_type = Container.verify_database_type_from_image(image)
             if is_db:
                 self.db_containers.append({"name": name, "db_type": db_type})
                 log.info(f"Container '{name}' is a database of type: {db_type}")
@@ -102,10 +145,10 @@ class Container:
             containers = [c['name'] for c in self.db_containers]
         else:
             containers = self.app_containers
-        # Start each container
-        for name in containers:
-            log.info(f"Starting container: {name}")
-            subprocess.run(["docker", "start", name], check=True)
+        # Start all containers with a single docker invocation
+        if containers:
+            log.info(f"Starting containers: {', '.join(containers)}")
+            subprocess.run([_DOCKER, "start", *containers], close_fds=False, check=True)
         log.info(f"Started {len(containers)} containers")
         return containers
 
@@ -127,43 +170,67 @@ class Container:
             to_stop = [c for c in containers if c.startswith(suffix) and (exclude_container is None or c != exclude_container)]
         else:
             to_stop = [c for c in containers if exclude_container is None or c != exclude_container]
-        # Stop each filtered container
-        for name in to_stop:
-            log.info(f"Stopping container: {name}")
-            subprocess.run(["docker", "stop", name], check=True)
+        # Stop all filtered containers with a single docker invocation
+        if to_stop:
+            log.info(f"Stopping containers: {', '.join(to_stop)}")
+            subprocess.run([_DOCKER, "stop", *to_stop], close_fds=False, check=True)
         log.info(f"Stopped {len(to_stop)} containers")
         return to_stop
 
     @staticmethod
-    def create_tar_gz(dest_dir=".", source_dir="/var/lib/docker/volumes", logger=None):
+    def create_tar_gz(dest_dir=".", source_dir="/var/lib/docker/volumes", logger=None, compression="gz"):
         """
-        Creates a tar.gz archive of the specified source directory.
+        Creates a compressed tar archive of the specified source directory.
+        compression is one of ARCHIVE_EXTENSIONS: 'gz' (default), 'zst' or 'none'.
         """
-        log = logger or logging.getLogger(__name__)
+        log = logger or _LOG
+        if compression not in ARCHIVE_EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
         log.info(f"Starting backup of Docker volumes from {source_dir}")
         if not os.path.exists(source_dir):
             log.error(f"Source directory {source_dir} does not exist")
             raise ValueError(f"Source directory {source_dir} does not exist")
+        # Pick an external compressor; tar is only piped through one when it is installed
+        compressor = None
+        if compression == "zst":
+            zstd = shutil.which("zstd")
+            if zstd:
+                compressor = [zstd, "-T0", "-3", "--long=27", "-q", "-c"]
+            else:
+                log.warning("zstd not found, falling back to gzip")
+                compression = "gz"
+        if compression == "gz":
+            pigz = shutil.which("pigz")
+            if pigz:
+                compressor = [pigz, "-p", str(os.cpu_count() or 1), "-1"]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        archive_name = f"docker_volumes_backup_{timestamp}.tar.gz"
+        archive_name = f"docker_volumes_backup_{timestamp}{ARCHIVE_EXTENSIONS[compression]}"
         archive_path = os.path.join(dest_dir, archive_name)
         log.info(f"Creating archive {archive_path}")
-        with tarfile.open(archive_path, "w:gz") as tar:
-            tar.add(source_dir, arcname=os.path.basename(source_dir))
+        if compressor or compression == "none":
+            # Stream tar into the multi-threaded compressor (or straight to the file)
+            source_dir = os.path.abspath(source_dir)
+            with open(archive_path, "wb") as archive:
+                tar = subprocess.Popen(
+                    [_TAR, "-C", os.path.dirname(source_dir), "-cf", "-", os.path.basename(source_dir)],
+                    stdout=subprocess.PIPE if compressor else archive,
+                    close_fds=False
+                )
+                if compressor:
+                    comp = subprocess.Popen(compressor, stdin=tar.stdout, stdout=archive, close_fds=False)
+                    # Let tar receive SIGPIPE if the compressor exits early
+                    tar.stdout.close()
+                    comp.wait()
+                tar.wait()
+            comp_rc = comp.returncode if compressor else 0
+            # tar exits with 1 when files changed while being read; the archive is still usable
+            if tar.returncode not in (0, 1) or comp_rc != 0:
+                log.error(f"Archive creation failed (tar: {tar.returncode}, compressor: {comp_rc})")
+                raise RuntimeError(f"Archive creation failed: {archive_path}")
+        else:
+            log.debug("pigz not found, falling back to tarfile")
+            # Stream mode with a 1 MiB buffer cuts per-block overhead on large volume trees
+            with tarfile.open(archive_path, "w|gz", bufsize=1 << 20) as tar:
+                tar.add(source_dir, arcname=os.path.basename(source_dir), filter=_skip_special_files)
         log.info(f"Backup completed successfully: {archive_path}")
         return archive_path
-
-
-if __name__ == "__main__":
-    containers = Container()
-    if not containers.running_containers:
-        print("No running containers found.")
-    else:
-        print("Running containers found:")
-        print("\nDatabase Containers:")
-        for db in containers.db_containers:
-            print(f"- {db['name']} ({db['db_type']})")
-        print("\nApplication Containers:")
-        for app in containers.app_containers:
-            print(f"- {app}")
-        containers.stop_containers(db=False)
\ No newline at end of file
@@ -1,9 +1,98 @@
-# Import necessary modules for subprocess execution, regular expressions, logging, system operations, and argument parsing
+# Import necessary modules for subprocess execution, logging, system operations, and argument parsing
 import subprocess
-import re
+import concurrent.futures
+import functools
+import hashlib
+import json
 import logging
+import os
 import sys
 import argparse
+import shutil
+
+# Absolute path of the docker CLI, resolved once. CPython only spawns children with
+# posix_spawn (instead of fork+exec) when the executable is given with a directory
+_DOCKER = shutil.which("docker") or "docker"
+
+# Streaming compressors for database dumps, keyed by file extension, in order of preference
+COMPRESSORS = {
+    "zst": ["zstd", "-T0", "-3", "-q", "-c"],
+    "gz": ["gzip", "-1", "-c"],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _compressor_cmd(compression):
+    """
+    Returns the COMPRESSORS command for compression with its executable resolved to an
+    absolute path (so it can be started with posix_spawn), or None if it is not installed.
+    """
+    cmd = COMPRESSORS[compression]
+    path = shutil.which(cmd[0])
+    return (path, *cmd[1:]) if path else None
+
+
+@functools.lru_cache(maxsize=32)
+def _inspect(container_name):
+    """
+    Returns the parsed `.Config` section of the container's `docker inspect` data (Image, Env, ...).
+    docker inspect is run only once per container; later calls are served from the cache.
+    """
+    # Let docker render only .Config as JSON instead of the whole inspect document
+    result = subprocess.run(
+        [_DOCKER, "inspect", "--format", "{{json .Config}}", container_name],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        close_fds=False,
+        check=True
+    )
+    return json.loads(result.stdout)
+
+
+@functools.lru_cache(maxsize=32)
+def _inspect_env(container_name):
+    """
+    Returns the container's environment variables as a dict, built once from the cached inspect data.
+    """
+    env = _inspect(container_name)["Env"] or []
+    return dict(item.partition("=")[::2] for item in env)
+
+
+# Amount of dump data written between two page cache evictions
+_FADVISE_INTERVAL = 64 << 20
+
+
+def _drop_page_cache(f, offset=0, length=0):
+    """
+    Flushes f to disk and tells the kernel its pages will not be re-read, so large dumps
+    do not evict the host's working set. length=0 means up to the end of the file.
+    Best effort: a no-op where posix_fadvise is unavailable or fails.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        f.flush()
+        os.fdatasync(f.fileno())
+        os.posix_fadvise(f.fileno(), offset, length, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+
+
+def _copy_with_checksum(src, dst):
+    """
+    Copies the src stream to dst in 1 MiB chunks and returns the SHA-256 hex digest of the data.
+    """
+    digest = hashlib.sha256()
+    written = dropped = 0
+    for chunk in iter(lambda: src.read(1 << 20), b""):
+        digest.update(chunk)
+        dst.write(chunk)
+        written += len(chunk)
+        if written - dropped >= _FADVISE_INTERVAL:
+            _drop_page_cache(dst, dropped, written - dropped)
+            dropped = written
+    return digest.hexdigest()
+
 
 class DatabaseBackup:
     """
@@ -45,14 +134,10 @@ class DatabaseBackup:
         Returns True if the MariaDB version is below 11.0
         """
         try:
-            # Split version string by dots to extract parts
-            parts = version.split('.')
-            # Convert first part to int if it's a digit, else default to 0
-            major = int(parts[0]) if parts[0].isdigit() else 0
-            # Check if major version is less than 11
-            return major < 11
-        except Exception:
-            # Return False on any parsing error
+            # Compare the major version, the part before the first dot
+            return int(version.partition('.')[0]) < 11
+        except (ValueError, AttributeError):
+            # Return False on any parsing error (e.g. "unknown" or "10a.1")
             return False
 
     @staticmethod
@@ -61,16 +146,8 @@ class DatabaseBackup:
         Retrieves the PostgreSQL user from the container (POSTGRES_USER), default 'postgres'.
         """
         try:
-            # Execute docker exec to get POSTGRES_USER environment variable
-            result = subprocess.run(
-                ["docker", "exec", container_name, "printenv", "POSTGRES_USER"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-            # Strip whitespace from output
-            user = result.stdout.strip()
+            # Read POSTGRES_USER from the cached inspect data instead of entering the container
+            user = _inspect_env(container_name).get("POSTGRES_USER")
             # Return user if found, else default to 'postgres'
             return user if user else "postgres"
         except Exception:
@@ -85,19 +162,7 @@ class DatabaseBackup:
         # Determine the environment variable name based on database type
         env_var = "MYSQL_ROOT_PASSWORD" if db_type == "MySQL" else "MARIADB_ROOT_PASSWORD"
         try:
-            # Run docker inspect to get environment variables
-            result = subprocess.run(
-                ["docker", "inspect", container_name, "--format", "{{range .Config.Env}}{{println .}}{{end}}"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-            # Parse each line to find the password variable
-            for line in result.stdout.splitlines():
-                if line.startswith(env_var + "="):
-                    return line.split("=", 1)[1]
-            return None
+            return _inspect_env(container_name).get(env_var)
         except Exception:
             return None
 
@@ -126,35 +191,21 @@ class DatabaseBackup:
         else:
             return None, None
         try:
-            # Inspect container environment variables
-            result = subprocess.run(
-                ["docker", "inspect", container_name, "--format", "{{range .Config.Env}}{{println .}}{{end}}"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-            user = None
-            password = None
-            # Parse environment variables
-            for line in result.stdout.splitlines():
-                if line.startswith(user_var + "="):
-                    user = line.split("=", 1)[1]
-                elif line.startswith(pass_var + "="):
-                    password = line.split("=", 1)[1]
-                elif fallback_user_var and line.startswith(fallback_user_var + "=") and not user:
-                    user = line.split("=", 1)[1]
-                elif fallback_pass_var and line.startswith(fallback_pass_var + "=") and not password:
-                    password = line.split("=", 1)[1]
+            env = _inspect_env(container_name)
+            # Primary variables win; fallbacks are used only when the primary is missing or empty
+            user = env.get(user_var) or (fallback_user_var and env.get(fallback_user_var))
+            password = env.get(pass_var) or (fallback_pass_var and env.get(fallback_pass_var))
             return user, password
         except Exception:
             return None, None
 
     @staticmethod
-    def backup_database(container_name, db_type, backup_file):
+    def backup_database(container_name, db_type, backup_file, compression=None, checksum=False):
         """
         Performs the database backup based on the type.
         Always uses the user and password specified in environment variables for MariaDB/MySQL.
+        If compression is a key of COMPRESSORS, the dump is compressed while it is streamed.
+        If checksum is True, a sha256sum-compatible '<backup_file>.sha256' is written, computed in-flight.
         """
         # Retrieve user and password from container environment
         user, password = DatabaseBackup.get_db_user_password(container_name, db_type)
@@ -162,128 +213,195 @@ class DatabaseBackup:
             print("User or password not found for MariaDB/MySQL backup.")
             return False
 
-        # Prepare password option for command
-        password_opt = ["-p" + password]
+        # Secrets for the dump tool. `docker exec -e NAME` copies NAME's value from the docker
+        # client's environment, so passwords never appear on a command line inside or outside the container
+        secret_env = {}
 
         if db_type == "MySQL" or db_type == "MariaDB":
             # Attempt to get the specific database name from environment
-            db_name = None
             try:
-                result = subprocess.run(
-                    ["docker", "inspect", container_name, "--format", "{{range .Config.Env}}{{println .}}{{end}}"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    check=True
-                )
-                for line in result.stdout.splitlines():
-                    if line.startswith("MYSQL_DATABASE="):
-                        db_name = line.split("=", 1)[1]
-                    elif line.startswith("MARIADB_DATABASE=") and not db_name:
-                        db_name = line.split("=", 1)[1]
+                env = _inspect_env(container_name)
+                db_name = env.get("MYSQL_DATABASE") or env.get("MARIADB_DATABASE")
             except Exception:
                 db_name = None
 
-            # Construct mysqldump or mariadb-dump command
-            if db_type == "MySQL":
-                cmd = [
-                    "docker", "exec", container_name,
-                    "mysqldump", "-u", user, *password_opt, db_name if db_name else "--all-databases"
-                ]
-            else:  # MariaDB
-                cmd = [
-                    "docker", "exec", container_name,
-                    "mariadb-dump", "-u", user, *password_opt, db_name if db_name else "--all-databases"
-                ]
+            # Construct mysqldump or mariadb-dump command, both read the password from MYSQL_PWD
+            secret_env["MYSQL_PWD"] = password
+            dump_tool = "mysqldump" if db_type == "MySQL" else "mariadb-dump"
+            cmd = [
+                _DOCKER, "exec", "-e", "MYSQL_PWD", container_name,
+                dump_tool, "-u", user, db_name if db_name else "--all-databases"
+            ]
         elif db_type == "PostgreSQL":
-            # Get PostgreSQL user and password
-            user_pg, password_pg = DatabaseBackup.get_db_user_password(container_name, db_type)
-            if not user_pg:
-                user_pg = "postgres"
+            # Reuse the PostgreSQL user and password retrieved above
+            exec_opts = []
+            if password:
+                # pg_dumpall reads the password from PGPASSWORD
+                secret_env["PGPASSWORD"] = password
+                exec_opts = ["-e", "PGPASSWORD"]
             cmd = [
-                "docker", "exec", container_name,
-                "pg_dumpall", "-U", user_pg
+                _DOCKER, "exec", *exec_opts, container_name,
+                "pg_dumpall", "-U", user or "postgres"
             ]
-            if password_pg:
-                # Set PGPASSWORD environment variable for password
-                cmd.insert(2, "-e")
-                cmd.insert(3, f"PGPASSWORD={password_pg}")
         elif db_type == "MongoDB":
-            # Construct mongodump command for MongoDB
+            # Construct mongodump command for MongoDB, compressed by mongodump itself
             cmd = [
-                "docker", "exec", container_name,
-                "mongodump", "--archive"
+                _DOCKER, "exec", container_name,
+                "mongodump", "--archive", "--gzip"
             ]
         else:
             print(f"Backup not implemented for type: {db_type}")
             return False
 
+        env = {**os.environ, **secret_env} if secret_env else None
+
         # Execute the backup command and write output to file
         with open(backup_file, "wb") as f:
-            proc = subprocess.run(cmd, stdout=f)
-            return proc.returncode == 0
+            # The last stage writes straight to the file unless the checksum has to see the bytes.
+            # close_fds=False is safe here: the pipe ends Python creates are non-inheritable,
+            # so concurrent backups never leak each other's pipes into their children
+            sink = subprocess.PIPE if checksum else f
+            procs = [subprocess.Popen(cmd, stdout=subprocess.PIPE if compression else sink, close_fds=False, env=env)]
+            try:
+                if compression:
+                    # Pipe the dump through the compressor so no uncompressed copy hits the disk
+                    procs.append(subprocess.Popen(
+                        _compressor_cmd(compression) or COMPRESSORS[compression],
+                        stdin=procs[0].stdout, stdout=sink, close_fds=False
+                    ))
+                    # Let the dumper receive SIGPIPE if the compressor exits early
+                    procs[0].stdout.close()
+                if checksum:
+                    digest = _copy_with_checksum(procs[-1].stdout, f)
+                for proc in reversed(procs):
+                    proc.wait()
+            finally:
+                # On errors (e.g. ENOSPC while copying) no child may be left running or unreaped
+                if procs[-1].stdout:
+                    procs[-1].stdout.close()
+                for proc in procs:
+                    if proc.poll() is None:
+                        proc.kill()
+                    proc.wait()
+            _drop_page_cache(f)
+        ok = all(proc.returncode == 0 for proc in procs)
+        if ok and checksum:
+            with open(f"{backup_file}.sha256", "w") as out:
+                out.write(f"{digest}  {os.path.basename(backup_file)}\n")
+        return ok
 
     @staticmethod
     def restart_containers(container_list):
         """
         Restarts the containers in the list.
         """
-        # Start each container in the list
-        for name in container_list:
-            subprocess.run(["docker", "start", name], check=True)
+        # Start all containers with a single docker invocation
+        if container_list:
+            subprocess.run([_DOCKER, "start", *container_list], close_fds=False, check=True)
 
     def manage_backup(self, container_name,
                       db_type,
-                      path="."):
+                      path=".",
+                      checksum=False):
         """
         Performs database backup for the specified container and type.
+        If checksum is True, a '.sha256' file is written next to the backup.
         """
         log = self.logger
         # Determine backup file name based on database type
         if db_type in (DatabaseBackup.MYSQL, DatabaseBackup.MARIADB, DatabaseBackup.POSTGRESQL):
             backup_file = f"{container_name}_{db_type}_backup.sql"
         elif db_type == DatabaseBackup.MONGODB:
-            backup_file = f"{container_name}_{db_type}_backup.archive"
+            backup_file = f"{container_name}_{db_type}_backup.archive.gz"
         else:
             raise ValueError(f"Unsupported db_type: {db_type}")
+        # Compress the dump on the fly with the first compressor installed on the host;
+        # mongodump output is already gzipped, so it is written as is
+        compression = None
+        if db_type != DatabaseBackup.MONGODB:
+            compression = next((ext for ext in COMPRESSORS if _compressor_cmd(ext)), None)
+        if compression:
+            backup_file = f"{backup_file}.{compression}"
         # Log the backup operation
         log.info(f"Performing backup of {db_type} database in container {container_name} to {path}/{backup_file}...")
         tmp_filename = f"{path}/{backup_file}"
         # Perform the backup
-        ok = DatabaseBackup.backup_database(container_name, db_type, tmp_filename)
+        ok = DatabaseBackup.backup_database(container_name, db_type, tmp_filename, compression, checksum)
         if ok:
             log.info("Database backup completed successfully.")
         else:
             log.error("Database backup failed.")
             raise RuntimeError("Backup failed")
 
+    def manage_backups(self, specs, path=".", max_workers=4, checksum=False):
+        """
+        Performs the backups of several (container_name, db_type) pairs concurrently.
+        max_workers bounds the number of simultaneous docker exec dumps (at least 1).
+        Returns the list of container names whose backup failed.
+        """
+        log = self.logger
+        max_workers = max(1, max_workers)
+
+        def backup(spec):
+            container_name, db_type = spec
+            try:
+                self.manage_backup(container_name, db_type, path, checksum)
+            except Exception as e:
+                log.error(f"Backup of {container_name} failed: {e}")
+                return container_name
+            return None
+
+        # Dumps mostly wait on docker, which releases the GIL, so threads are enough
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [name for name in executor.map(backup, specs) if name]
+
+    @staticmethod
+    def get_image_tag(container_name):
+        """
+        Returns the tag of the container's image (e.g. '11.2.1' for 'mariadb:11.2.1'), '' if untagged.
+        """
+        try:
+            image = _inspect(container_name)["Image"]
+        except Exception:
+            return ""
+        # Drop any digest, then split off the tag (a ':' before a '/' is a registry port)
+        image = image.split("@", 1)[0]
+        _, sep, tag = image.rpartition(":")
+        return tag if sep and "/" not in tag else ""
+
     @staticmethod
     def get_real_mariadb_version(container_name):
         """
         Returns the real MariaDB version from the container.
+        The image tag is used when it carries a version; otherwise the client inside the container is asked.
         """
+        # A versioned tag (e.g. '11.2.1' or '10.11-jammy') avoids a docker exec
+        tag = DatabaseBackup.get_image_tag(container_name)
+        if tag[:1].isdigit():
+            return tag.split("-", 1)[0]
         try:
             # Execute mariadb --version inside the container
             result = subprocess.run(
-                ["docker", "exec", container_name, "mariadb", "--version"],
+                [_DOCKER, "exec", container_name, "mariadb", "--version"],
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+                stderr=subprocess.DEVNULL,
+                close_fds=False,
                 check=True
             )
-            # Use regex to extract version number from output
-            match = re.search(r'from ([\d\.]+)-MariaDB', result.stdout)
-            if match:
-                return match.group(1)
+            # Extract the version from "... from X.Y.Z-MariaDB, client ..." with plain string splits
+            _, _, tail = result.stdout.decode().partition("from ")
+            version, sep, _ = tail.partition("-MariaDB")
+            if sep and version.strip():
+                return version.strip()
         except Exception as e:
             print(f"Error retrieving MariaDB version: {e}")
         return "unknown"
 
-# Configure logging to INFO level
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
 if __name__ == "__main__":
+    # Configure logging to INFO level
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
     # Set up command-line argument parser
     parser = argparse.ArgumentParser(description="Backup database from Docker container")
     parser.add_argument(